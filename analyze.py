@@ -0,0 +1,356 @@
+"""Monte Carlo estimate of how often a level stays solvable after collapse.
+
+Superposition walls get a uniform random collapse probability and then
+collapse solid with that probability; a level with several goals measures
+one of them uniformly. Millions of such outcomes are sampled per level with
+NumPy and checked in batch for reachability and box-to-goal feasibility.
+
+The feasibility test is a relaxation in which every simplification errs
+towards solvable, so the reported rate is an upper bound. In other words,
+one minus the rate is the smallest share of outcomes that are certainly
+impossible. Boxes cannot be entangled, so they only ever move by being
+pushed. A box at c moves to c + d either by the player stepping in from
+c - d, which needs c to be free of player-blocked tiles (T) and c - d to
+be walkable, or by a chain push, which needs another block at c - d. A
+chain push is allowed whenever the level has another movable object and
+c - d could hold it; whether a block can actually be brought there is not
+checked. Movable blocks are otherwise treated as absent, and the player's
+path between pushes is not checked. Path lengths are lower bounds: the
+shortest walk to where a first push could start, plus the number of
+pushes.
+
+    python analyze.py --samples 1000000
+    python analyze.py levels/level5.json --json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import game
+
+LEVEL_PATH = 'levels'
+
+# Samples drawn per batch, and distinct wall configurations flooded at once.
+# Together they bound memory at a few tens of MB per level.
+SAMPLE_BATCH = 1 << 20
+EVAL_BATCH = 1 << 14
+
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+class LevelModel:
+    """Static masks and quantum elements of a level, indexed [y, x]"""
+
+    def __init__(self, layout):
+        grid = game.Grid(game.GRID_WIDTH, game.GRID_HEIGHT)
+        game.load_level(grid, layout)
+        player = game.find_player(grid)
+        quantum_goal = game.setup_quantum_goal(grid)
+
+        # Only the area covered by the layout matters; the rest of the grid is empty.
+        shape = (len(layout), max((len(row) for row in layout), default=0))
+        self.shape = shape
+        self.player_free = np.ones(shape, dtype=bool)
+        self.box_free = np.ones(shape, dtype=bool)
+        # The player cannot enter T tiles, so a box there cannot be pushed directly.
+        self.box_pushable = np.ones(shape, dtype=bool)
+        movables = 0
+        self.walls = []
+        self.boxes = []
+        goals = []
+
+        for x in range(shape[1]):
+            for y in range(shape[0]):
+                for entity in grid.get_entities(x, y):
+                    if isinstance(entity, game.UnmovableTile):
+                        self.player_free[y, x] = False
+                        self.box_free[y, x] = False
+                    elif isinstance(entity, game.PlayerBlockedTile):
+                        self.player_free[y, x] = False
+                        self.box_pushable[y, x] = False
+                    elif isinstance(entity, game.SuperpositionWall):
+                        self.walls.append((x, y))
+                    elif isinstance(entity, game.SchrodingerBox):
+                        self.boxes.append((x, y))
+                        movables += 1
+                    elif isinstance(entity, game.MovableBlock):
+                        movables += 1
+                    elif isinstance(entity, game.Goal):
+                        goals.append((x, y))
+
+        self.player = (player.x, player.y) if player else None
+        # A box can only be chain-pushed if something else can relay the push.
+        self.chain_push = movables > 1
+        if quantum_goal is not None:
+            self.goals = list(quantum_goal.positions)
+            weights = np.asarray(quantum_goal.probabilities, dtype=float)
+            self.goal_weights = weights / weights.sum()
+        else:
+            self.goals = goals
+            self.goal_weights = np.full(len(goals), 1 / len(goals)) if goals else np.zeros(0)
+
+
+def shift(a, dx, dy):
+    """Move every cell of a (N, H, W) mask by (dx, dy), filling with False"""
+    out = np.zeros_like(a)
+    h, w = a.shape[1:]
+    ys, yd = (slice(0, h - dy), slice(dy, h)) if dy >= 0 else (slice(-dy, h), slice(0, h + dy))
+    xs, xd = (slice(0, w - dx), slice(dx, w)) if dx >= 0 else (slice(-dx, w), slice(0, w + dx))
+    out[:, yd, xd] = a[:, ys, xs]
+    return out
+
+
+def flood(start, passable):
+    """Batched BFS; returns step distances with -1 for unreachable cells"""
+    reached = start & passable
+    dist = np.where(reached, 0, -1).astype(np.int16)
+    frontier = reached
+    step = 0
+    while frontier.any():
+        step += 1
+        grown = np.zeros_like(frontier)
+        for dx, dy in DIRECTIONS:
+            grown |= shift(frontier, dx, dy)
+        frontier = grown & passable & ~reached
+        dist[frontier] = step
+        reached |= frontier
+    return dist
+
+
+def push_flood(start, box_free, box_pushable, player_free, first_pusher, chain_push):
+    """Batched BFS over box positions counting pushes
+
+    A push in direction d moves the box from c to c + d. A direct push needs
+    a player at c - d who can step into c, so c must be in box_pushable. The
+    first direct push uses the player's actual reachable area; later ones
+    only require the pushing cell to be walkable. With chain_push, a block
+    at c - d may relay the push instead, which only needs c - d to be free
+    for blocks.
+    """
+    reached = start.copy()
+    dist = np.where(reached, 0, -1).astype(np.int16)
+    frontier = reached
+    pusher = first_pusher
+    step = 0
+    while frontier.any():
+        step += 1
+        grown = np.zeros_like(frontier)
+        for dx, dy in DIRECTIONS:
+            movers = frontier & box_pushable & shift(pusher, dx, dy)
+            if chain_push:
+                movers |= frontier & shift(box_free, dx, dy)
+            grown |= shift(movers, dx, dy)
+        frontier = grown & box_free & ~reached
+        dist[frontier] = step
+        reached |= frontier
+        pusher = player_free
+    return dist
+
+
+def sample_batch(model, n, rng):
+    """Draw n collapse outcomes; returns (wall solidity, goal index)"""
+    k = len(model.walls)
+    probabilities = rng.random((n, k))
+    solid = rng.random((n, k)) < probabilities
+    if len(model.goals):
+        goal = rng.choice(len(model.goals), size=n, p=model.goal_weights)
+    else:
+        goal = np.zeros(n, dtype=np.intp)
+    return solid, goal
+
+
+def evaluate_configs(model, solid):
+    """Lower-bound path length per (wall configuration, goal), -1 if infeasible"""
+    n = solid.shape[0]
+    h, w = model.shape
+    length = np.full((n, len(model.goals)), -1, dtype=np.int32)
+    if model.player is None or not model.goals or not model.boxes:
+        return length
+
+    wall_map = np.zeros((n, h, w), dtype=bool)
+    for i, (x, y) in enumerate(model.walls):
+        wall_map[:, y, x] = solid[:, i]
+    player_free = model.player_free[None] & ~wall_map
+    box_free = model.box_free[None] & ~wall_map
+
+    goal_xy = np.asarray(model.goals)
+    gx, gy = goal_xy[:, 0], goal_xy[:, 1]
+    px, py = model.player
+
+    for bx, by in model.boxes:
+        start = np.zeros((n, h, w), dtype=bool)
+        start[:, py, px] = True
+        walkable = player_free.copy()
+        walkable[:, by, bx] = False
+        walk = flood(start, walkable)
+
+        box = np.zeros((n, h, w), dtype=bool)
+        box[:, by, bx] = True
+        pushes = push_flood(box, box_free, model.box_pushable[None], player_free,
+                            walk >= 0, model.chain_push)[:, gy, gx].astype(np.int32)
+
+        # Cheapest walk to any cell the first push could start from: next to
+        # the box, or at the end of an unbroken line of cells that blocks
+        # could fill for a chain push.
+        approach = np.full(n, np.iinfo(np.int16).max, dtype=np.int32)
+        for dx, dy in DIRECTIONS:
+            line = np.ones(n, dtype=bool)
+            k = 1
+            while line.any():
+                sx, sy = bx - k * dx, by - k * dy
+                if not (0 <= sx < w and 0 <= sy < h):
+                    break
+                if k == 1 and not model.box_pushable[by, bx]:
+                    reachable = np.zeros(n, dtype=bool)
+                else:
+                    reachable = line & (walk[:, sy, sx] >= 0)
+                approach = np.where(reachable, np.minimum(approach, walk[:, sy, sx]), approach)
+                if not model.chain_push:
+                    break
+                line &= box_free[:, sy, sx]
+                k += 1
+
+        # A box that starts on the goal needs no moves at all; otherwise the
+        # player must be able to reach somewhere a first push can start from.
+        no_start = (approach == np.iinfo(np.int16).max)[:, None]
+        pushes = np.where((pushes > 0) & no_start, -1, pushes)
+        total = np.where(pushes == 0, 0, approach[:, None] + pushes)
+        better = (pushes >= 0) & ((length < 0) | (total < length))
+        length = np.where(better, total, length)
+
+    return length
+
+
+def evaluate_batch(model, solid, goal):
+    """Lower-bound path length per sample, -1 if infeasible
+
+    Samples only differ in which walls are solid and which goal was chosen,
+    so each distinct wall configuration is flooded once and shared.
+    """
+    k = solid.shape[1]
+    if k <= 62:
+        # Pack each configuration into an integer key; a 1-D unique is far
+        # cheaper than comparing boolean rows.
+        keys = solid.astype(np.int64) @ (np.int64(1) << np.arange(k, dtype=np.int64))
+        keys, inverse = np.unique(keys, return_inverse=True)
+        configs = (keys[:, None] >> np.arange(k, dtype=np.int64)) & 1 == 1
+    else:
+        configs, inverse = np.unique(solid, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    table = np.empty((configs.shape[0], max(1, len(model.goals))), dtype=np.int32)
+    for i in range(0, configs.shape[0], EVAL_BATCH):
+        chunk = evaluate_configs(model, configs[i:i + EVAL_BATCH])
+        table[i:i + EVAL_BATCH, :chunk.shape[1]] = chunk
+    if not model.goals:
+        table[:] = -1
+    return table[inverse, goal]
+
+
+def analyze_level(layout, samples, rng):
+    """Sample a level and summarise the outcome distribution"""
+    model = LevelModel(layout)
+    k = len(model.walls)
+    solvable_total = 0
+    lengths = []
+    by_goal = np.zeros((max(1, len(model.goals)), 2), dtype=np.int64)
+    by_solid = np.zeros((k + 1, 2), dtype=np.int64)
+
+    done = 0
+    while done < samples:
+        n = min(SAMPLE_BATCH, samples - done)
+        solid, goal = sample_batch(model, n, rng)
+        length = evaluate_batch(model, solid, goal)
+        ok = length >= 0
+        solvable_total += int(ok.sum())
+        lengths.append(length[ok])
+        np.add.at(by_goal, (goal, 0), 1)
+        np.add.at(by_goal, (goal, 1), ok)
+        solid_count = solid.sum(axis=1)
+        np.add.at(by_solid, (solid_count, 0), 1)
+        np.add.at(by_solid, (solid_count, 1), ok)
+        done += n
+
+    lengths = np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int32)
+    rate = solvable_total / samples
+    result = {
+        'samples': samples,
+        'superposition_walls': k,
+        'goals': [list(g) for g in model.goals],
+        'solvable_rate': rate,
+        'solvable_rate_ci95': 1.96 * float(np.sqrt(rate * (1 - rate) / samples)),
+        'solvable_rate_by_goal': [
+            float(s / t) if t else None for t, s in by_goal[:len(model.goals)]
+        ],
+        'solvable_rate_by_solid_walls': [
+            float(s / t) if t else None for t, s in by_solid
+        ],
+        'path_length': None,
+    }
+    if lengths.size:
+        values, counts = np.unique(lengths, return_counts=True)
+        result['path_length'] = {
+            'min': int(lengths.min()),
+            'p50': float(np.percentile(lengths, 50)),
+            'p90': float(np.percentile(lengths, 90)),
+            'max': int(lengths.max()),
+            'histogram': {int(v): int(c) for v, c in zip(values, counts)},
+        }
+    return result
+
+
+def format_rates(rates):
+    return ' '.join('-' if r is None else f'{r:.0%}' for r in rates)
+
+
+def print_report(name, result, elapsed):
+    print(f"{name}")
+    print(f"  {result['samples']:,} samples in {elapsed:.2f}s, "
+          f"{result['superposition_walls']} superposition walls, {len(result['goals'])} goal(s)")
+    print(f"  solvable: {result['solvable_rate']:.2%} +/- {result['solvable_rate_ci95']:.2%}")
+    if len(result['goals']) > 1:
+        print(f"  by goal {result['goals']}: {format_rates(result['solvable_rate_by_goal'])}")
+    if result['superposition_walls']:
+        print(f"  by solid wall count 0..{result['superposition_walls']}: "
+              f"{format_rates(result['solvable_rate_by_solid_walls'])}")
+    lengths = result['path_length']
+    if lengths:
+        print(f"  path length (lower bound): min {lengths['min']}, median {lengths['p50']:.0f}, "
+              f"p90 {lengths['p90']:.0f}, max {lengths['max']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('levels', nargs='*', help='level files (default: all in levels/)')
+    parser.add_argument('--samples', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    level_files = args.levels or sorted(glob.glob(os.path.join(LEVEL_PATH, '*.json')))
+    rng = np.random.default_rng(args.seed)
+    results = {}
+
+    for filename in level_files:
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        start = time.perf_counter()
+        result = analyze_level(data.get('layout', []), args.samples, rng)
+        elapsed = time.perf_counter() - start
+        result['name'] = data.get('name', filename)
+        results[filename] = result
+        if not args.json:
+            print_report(f"{filename}: {result['name']}", result, elapsed)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
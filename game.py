@@ -2,6 +2,7 @@ import pygame
 import json
 import random
 import math
+import threading
 import time
 
 # Game configuration
@@ -29,16 +30,33 @@ PLAYER_BLOCKED_COLOR = (150, 150, 150)
 # Track selected box for entanglement
 selected_box = None
 
+# Font objects by size and pre-rendered tiles by colour, filled lazily or by a Preloader
+FONTS = {}
+TILE_SURFACES = {}
+
+# Font sizes used by the level intro and the in-game instructions
+GAME_FONT_SIZES = (48, 28, 24)
+
 
 class Entity:
     """Base class for all game objects"""
 
-    def __init__(self, x, y, color):
+    # Entities only carry their position per instance; the colour lives on
+    # the class unless a subclass declares its own ``color`` slot.
+    __slots__ = ('x', 'y')
+    color = BLACK
+
+    def __init__(self, x, y, color=None):
         self.x = x
         self.y = y
-        self.color = color
+        if color is not None:
+            self.color = color
 
     def draw(self, surface):
+        tile = TILE_SURFACES.get(self.color)
+        if tile is not None:
+            surface.blit(tile, (self.x * TILE_SIZE, self.y * TILE_SIZE))
+            return
         rect = pygame.Rect(self.x * TILE_SIZE, self.y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
         pygame.draw.rect(surface, self.color, rect)
 
@@ -46,9 +64,17 @@ class Entity:
         return False
 
 
+class StaticTile(Entity):
+    """Flyweight base for immutable tiles: all shared state lives on the class"""
+
+    __slots__ = ()
+
+
 class MovableBlock(Entity):
     """Block that can be pushed around, optionally entanglable"""
 
+    __slots__ = ('color', 'entanglable', 'entangled_with', 'selected')
+
     def __init__(self, x, y, entanglable=False):
         super().__init__(x, y, MOVABLE_COLOR)
         self.entanglable = entanglable
@@ -72,23 +98,30 @@ class MovableBlock(Entity):
             pygame.draw.rect(surface, (255, 0, 0), rect, 3)
 
 
-class UnmovableTile(Entity):
+class UnmovableTile(StaticTile):
     """Solid wall that blocks all movement"""
 
-    def __init__(self, x, y):
-        super().__init__(x, y, UNMOVABLE_COLOR)
+    __slots__ = ()
+    color = UNMOVABLE_COLOR
 
 
-class PlayerBlockedTile(Entity):
+class PlayerBlockedTile(StaticTile):
     """Special tile that only blocks the player, not other entities"""
 
-    def __init__(self, x, y):
-        super().__init__(x, y, PLAYER_BLOCKED_COLOR)
+    __slots__ = ()
+    color = PLAYER_BLOCKED_COLOR
+
+
+# Shared time origin for the shimmer animation; the per-wall random phase
+# offset already keeps neighbouring walls out of sync.
+SHIMMER_EPOCH = time.time()
 
 
 class SuperpositionWall(Entity):
     """Quantum wall that exists in superposition until observed"""
 
+    __slots__ = ('color', 'is_superposition', 'collapse_probability', 'shimmer_offset', '_is_solid')
+
     def __init__(self, x, y, collapse_probability=None):
         if collapse_probability is None:
             collapse_probability = random.random()
@@ -96,13 +129,13 @@ class SuperpositionWall(Entity):
         self.is_superposition = True
         self.collapse_probability = collapse_probability
         self.shimmer_offset = random.random() * math.pi * 2
-        self.creation_time = time.time()
+        self._is_solid = True
 
     def draw(self, surface):
         if self.is_superposition:
             # Create shimmering quantum effect
             current_time = time.time()
-            shimmer = math.sin((current_time - self.creation_time) * 4 + self.shimmer_offset)
+            shimmer = math.sin((current_time - SHIMMER_EPOCH) * 4 + self.shimmer_offset)
             base_alpha = int(50 + 30 * shimmer)
             alpha_variation = int(base_alpha * self.collapse_probability)
             color_variation = int(100 + 50 * shimmer * self.collapse_probability)
@@ -145,27 +178,31 @@ class SuperpositionWall(Entity):
     def can_block(self):
         if self.is_superposition:
             return True
-        return getattr(self, '_is_solid', True)
+        return self._is_solid
 
 
 class SchrodingerBox(MovableBlock):
     """Special box for the Sokoban puzzle"""
 
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__(x, y)
         self.color = BOX_COLOR
 
 
-class Goal(Entity):
+class Goal(StaticTile):
     """Target location for boxes"""
 
-    def __init__(self, x, y):
-        super().__init__(x, y, GOAL_COLOR)
+    __slots__ = ()
+    color = GOAL_COLOR
 
 
 class QuantumParticle:
     """Goal that exists in quantum superposition across multiple positions"""
 
+    __slots__ = ('positions', 'probabilities', 'collapsed', 'chosen_position')
+
     def __init__(self, positions, probabilities):
         self.positions = positions
         self.probabilities = probabilities
@@ -202,8 +239,8 @@ class QuantumParticle:
 class Player(Entity):
     """The player character"""
 
-    def __init__(self, x, y):
-        super().__init__(x, y, PLAYER_COLOR)
+    __slots__ = ()
+    color = PLAYER_COLOR
 
     def move(self, dx, dy, grid):
         """Attempt to move in the given direction"""
@@ -302,22 +339,9 @@ class Grid:
     def get_entities(self, x, y):
         return list(self.cells[x][y])
 
-    def _handle_entanglement(self, entity, dx, dy):
-        """Move entangled partner when entity moves"""
-        if hasattr(entity, 'entangled_with') and entity.entangled_with:
-            partner = entity.entangled_with
-            new_x, new_y = partner.x + dx, partner.y + dy
-            if self.in_bounds(new_x, new_y):
-                self.move_entity(partner, new_x, new_y)
-
-    def push(self, entity, dx, dy):
-        """Attempt to push an entity in the given direction"""
-        new_x, new_y = entity.x + dx, entity.y + dy
-
-        if not self.in_bounds(new_x, new_y):
-            return False
-
-        entities = self.get_entities(new_x, new_y)
+    def _blocking_entities(self, x, y):
+        """Collapse superposition walls at a cell and return what blocks pushed entities"""
+        entities = self.get_entities(x, y)
 
         # Collapse superposition walls
         for ent in entities[:]:
@@ -335,6 +359,27 @@ class Grid:
                     (not isinstance(ent, SuperpositionWall) or ent.can_block())):
                 blocking_entities.append(ent)
 
+        return entities, blocking_entities
+
+    def _handle_entanglement(self, entity, dx, dy):
+        """Move entangled partner when entity moves, unless its target cell is occupied"""
+        if hasattr(entity, 'entangled_with') and entity.entangled_with:
+            partner = entity.entangled_with
+            new_x, new_y = partner.x + dx, partner.y + dy
+            if self.in_bounds(new_x, new_y):
+                _, blocking_entities = self._blocking_entities(new_x, new_y)
+                if not blocking_entities:
+                    self.move_entity(partner, new_x, new_y)
+
+    def push(self, entity, dx, dy):
+        """Attempt to push an entity in the given direction"""
+        new_x, new_y = entity.x + dx, entity.y + dy
+
+        if not self.in_bounds(new_x, new_y):
+            return False
+
+        entities, blocking_entities = self._blocking_entities(new_x, new_y)
+
         # Can move to position with goal
         if any(isinstance(e, Goal) for e in entities) and not blocking_entities:
             self.move_entity(entity, new_x, new_y)
@@ -376,6 +421,132 @@ def load_level(grid, layout):
                 grid.add_entity(entity_map[char](x, y))
 
 
+def find_player(grid):
+    """Return the player entity on the grid, or None"""
+    for x in range(grid.width):
+        for y in range(grid.height):
+            for e in grid.get_entities(x, y):
+                if isinstance(e, Player):
+                    return e
+    return None
+
+
+def setup_quantum_goal(grid):
+    """Replace multiple goals with a single QuantumParticle over their positions"""
+    goal_positions = []
+    for x in range(grid.width):
+        for y in range(grid.height):
+            for entity in grid.get_entities(x, y):
+                if isinstance(entity, Goal):
+                    goal_positions.append((x, y))
+
+    if len(goal_positions) <= 1:
+        return None
+
+    # Remove regular goals and create quantum particle
+    for pos in goal_positions:
+        for entity in grid.get_entities(pos[0], pos[1]):
+            if isinstance(entity, Goal):
+                grid.remove_entity(entity)
+
+    probabilities = [1 / len(goal_positions)] * len(goal_positions)
+    return QuantumParticle(goal_positions, probabilities)
+
+
+def init_display():
+    """Initialise only the subsystems the game uses and return the shared window"""
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != (SCREEN_WIDTH, SCREEN_HEIGHT):
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    return screen
+
+
+def shutdown():
+    """Quit pygame and drop cached fonts and tiles, which pygame.quit() frees"""
+    FONTS.clear()
+    TILE_SURFACES.clear()
+    pygame.quit()
+
+
+def get_font(size):
+    """Return the default font at the given size, creating it once"""
+    font = FONTS.get(size)
+    if font is None:
+        font = FONTS[size] = pygame.font.Font(None, size)
+    return font
+
+
+def load_level_data(level_files):
+    """Read every level file in order"""
+    all_levels = []
+    for filename in level_files:
+        with open(filename, 'r', encoding='utf-8') as f:
+            all_levels.append(json.load(f))
+    return all_levels
+
+
+def prerender_tiles():
+    """Build one solid tile surface per entity colour"""
+    colors = (UNMOVABLE_COLOR, PLAYER_BLOCKED_COLOR, GOAL_COLOR, PLAYER_COLOR,
+              MOVABLE_COLOR, ENTANGLABLE_COLOR, BOX_COLOR)
+    tiles = {}
+    for color in colors:
+        tile = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        tile.fill(color)
+        tiles[color] = tile
+    return tiles
+
+
+class Preloader:
+    """Loads level data and tile surfaces in the background while the menu runs
+
+    File reading and surface filling happen on a worker thread. Fonts are
+    created on the main thread, one per step() call, because SDL_ttf is not
+    safe to use from two threads at once.
+    """
+
+    def __init__(self, level_files, font_sizes=GAME_FONT_SIZES):
+        self.level_files = level_files
+        self.levels = None
+        self.tiles = None
+        # Seconds the worker took, set once it has finished
+        self.elapsed = None
+        self._error = None
+        self._fonts = [size for size in font_sizes if size not in FONTS]
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='preload', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.levels = load_level_data(self.level_files)
+            self.tiles = prerender_tiles()
+        except Exception as exc:
+            self._error = exc
+        self.elapsed = time.perf_counter() - self._start
+
+    def step(self):
+        """Create one pending font; call once per menu frame"""
+        if self._fonts:
+            get_font(self._fonts.pop())
+
+    def result(self):
+        """Finish loading and return the level data, installing the tiles"""
+        while self._fonts:
+            self.step()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        # Match the display's pixel format now that the window exists.
+        for color, tile in self.tiles.items():
+            TILE_SURFACES[color] = tile.convert() if pygame.display.get_surface() else tile
+        return self.levels
+
+
 def wrap_text(text, font, max_width):
     """Break text into lines that fit within the given width"""
     words = text.split()
@@ -403,9 +574,9 @@ def wrap_text(text, font, max_width):
 
 def show_level_intro(screen, clock, level_data, level_number):
     """Display level info"""
-    font_title = pygame.font.Font(None, 48)
-    font_desc = pygame.font.Font(None, 28)
-    font_continue = pygame.font.Font(None, 24)
+    font_title = get_font(48)
+    font_desc = get_font(28)
+    font_continue = get_font(24)
 
     level_name = level_data.get('name', f'Level {level_number + 1}')
     level_description = level_data.get('description', 'No description available.')
@@ -469,65 +640,66 @@ def show_level_intro(screen, clock, level_data, level_number):
         clock.tick(FPS)
 
 
-def run_levels(level_files):
-    """Main game loop"""
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+def run_levels(level_files, save_path=None, resume=False, preloader=None):
+    """Main game loop
+
+    With save_path set, progress is autosaved there after every change and
+    resume=True continues from that snapshot when one exists. A Preloader
+    started earlier (e.g. by the menu) supplies the level data and assets;
+    the window is shared with the caller if one is already open.
+    """
+    global selected_box
+
+    # savestate imports this module, so it can only be loaded at call time.
+    import savestate
+
+    screen = init_display()
     pygame.display.set_caption("Quantum Sokoban - Superposition Mechanics")
     clock = pygame.time.Clock()
 
     # Load all level data
-    all_levels = []
-    for filename in level_files:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_levels.append(data)
+    if preloader is None:
+        preloader = Preloader(level_files)
+    all_levels = preloader.result()
 
     def create_level(index):
         """Initialize a level from layout data"""
         grid = Grid(GRID_WIDTH, GRID_HEIGHT)
         load_level(grid, all_levels[index].get('layout', []))
-
-        # find the player and stash it
-        player = None
-        for x in range(grid.width):
-            for y in range(grid.height):
-                for e in grid.get_entities(x, y):
-                    if isinstance(e, Player):
-                        player = e
-                        break
-                if player: break
-            if player: break
-
-        return grid, player
+        return grid, find_player(grid)
 
     current_level = 0
 
+    snapshot = None
+    if save_path and resume:
+        try:
+            snapshot = savestate.load(save_path)
+        except (savestate.SaveStateError, OSError) as exc:
+            print(f"Ignoring save file {save_path}: {exc}")
+        if snapshot and snapshot[0] >= len(all_levels):
+            snapshot = None
+        if snapshot:
+            current_level = snapshot[0]
+
     # Show intro for first level
     if not show_level_intro(screen, clock, all_levels[current_level], current_level):
-        pygame.quit()
+        shutdown()
         return
 
-    grid, player = create_level(current_level)
+    if snapshot:
+        current_level, grid, player, quantum_goal = snapshot
+    else:
+        grid, player = create_level(current_level)
 
-    # Setup quantum goal if multiple goals exist
-    goal_positions = []
-    for x in range(grid.width):
-        for y in range(grid.height):
-            for entity in grid.get_entities(x, y):
-                if isinstance(entity, Goal):
-                    goal_positions.append((x, y))
+        # Setup quantum goal if multiple goals exist
+        quantum_goal = setup_quantum_goal(grid)
 
-    quantum_goal = None
-    if len(goal_positions) > 1:
-        # Remove regular goals and create quantum particle
-        for pos in goal_positions:
-            for entity in grid.get_entities(pos[0], pos[1]):
-                if isinstance(entity, Goal):
-                    grid.remove_entity(entity)
+    autosaver = savestate.Autosaver(save_path) if save_path else None
 
-        probabilities = [1 / len(goal_positions)] * len(goal_positions)
-        quantum_goal = QuantumParticle(goal_positions, probabilities)
+    def autosave():
+        """Snapshot the current state; the file is written off the main thread"""
+        if autosaver:
+            autosaver.submit(savestate.encode(current_level, grid, quantum_goal))
 
     def check_victory(grid):
         """Check if all boxes are on goals"""
@@ -541,9 +713,11 @@ def run_levels(level_files):
         return False
 
     running = True
-    font = pygame.font.Font(None, 24)
+    font = get_font(24)
 
     while running:
+        changed = False
+
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -554,6 +728,7 @@ def run_levels(level_files):
                 grid_x, grid_y = mouse_x // TILE_SIZE, mouse_y // TILE_SIZE
                 if grid.in_bounds(grid_x, grid_y):
                     handle_entangle_click(grid, grid_x, grid_y)
+                    changed = True
 
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -565,25 +740,14 @@ def run_levels(level_files):
                     selected_box = None
 
                     # Recreate quantum goal
-                    goal_positions = []
-                    for x in range(grid.width):
-                        for y in range(grid.height):
-                            for entity in grid.get_entities(x, y):
-                                if isinstance(entity, Goal):
-                                    goal_positions.append((x, y))
-
-                    quantum_goal = None
-                    if len(goal_positions) > 1:
-                        for pos in goal_positions:
-                            for entity in grid.get_entities(pos[0], pos[1]):
-                                if isinstance(entity, Goal):
-                                    grid.remove_entity(entity)
-                        quantum_goal = QuantumParticle(goal_positions, [1 / len(goal_positions)] * len(goal_positions))
+                    quantum_goal = setup_quantum_goal(grid)
+                    changed = True
 
                 elif event.key == pygame.K_m and quantum_goal:
                     # Measure quantum particle
                     collapsed_pos = quantum_goal.measure(grid)
                     print(f"Quantum goal collapsed to position {collapsed_pos}")
+                    changed = True
 
                 elif event.key in (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT):
                     dx, dy = 0, 0
@@ -596,6 +760,10 @@ def run_levels(level_files):
                     elif event.key == pygame.K_RIGHT:
                         dx = 1
                     player.move(dx, dy, grid)
+                    changed = True
+
+        if changed:
+            autosave()
 
         # Render everything
         screen.fill(BLACK)
@@ -660,21 +828,14 @@ def run_levels(level_files):
                 selected_box = None
 
                 # Setup quantum goal for new level
-                goal_positions = []
-                for x in range(grid.width):
-                    for y in range(grid.height):
-                        for entity in grid.get_entities(x, y):
-                            if isinstance(entity, Goal):
-                                goal_positions.append((x, y))
-
-                quantum_goal = None
-                if len(goal_positions) > 1:
-                    for pos in goal_positions:
-                        for entity in grid.get_entities(pos[0], pos[1]):
-                            if isinstance(entity, Goal):
-                                grid.remove_entity(entity)
-                    quantum_goal = QuantumParticle(goal_positions, [1 / len(goal_positions)] * len(goal_positions))
+                quantum_goal = setup_quantum_goal(grid)
+                autosave()
             else:
                 running = False
+                # All levels done; nothing left to resume.
+                if autosaver:
+                    autosaver.discard()
 
-    pygame.quit()
\ No newline at end of file
+    if autosaver:
+        autosaver.close()
+    shutdown()
\ No newline at end of file
@@ -1,3 +1,9 @@
+import time
+
+# Startup reference point: taken once this script starts running, before the
+# heavy imports below. Interpreter startup itself is not included.
+START_TIME = time.perf_counter()
+
 import sys
 import os
 import glob
@@ -6,54 +12,70 @@ import pygame
 # Import the main game module (game.py should define a `run_levels(level_files)` function)
 import game
 
-# Configuration
-SCREEN_WIDTH = 640
-SCREEN_HEIGHT = 480
+# Configuration: the menu shares the game's window so it is only created once
+SCREEN_WIDTH = game.SCREEN_WIDTH
+SCREEN_HEIGHT = game.SCREEN_HEIGHT
 FPS = 60
 
 # Paths
 game.LEVEL_PATH = 'levels'
+SAVE_PATH = 'savegame.bin'
 
-# Initialize Pygame
-ingame = pygame.init()
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Baba Quantum")
-
-# Colors and fonts
+# Colors and font sizes
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 HIGHLIGHT = (200, 200, 50)
 
-title_font = pygame.font.SysFont(None, 72)
-menu_font = pygame.font.SysFont(None, 48)
+TITLE_FONT_SIZE = 72
+MENU_FONT_SIZE = 48
 
 menu_options = ['Play']
+if os.path.exists(SAVE_PATH):
+    menu_options.insert(0, 'Continue')
 
-def draw_menu(selected):
+def draw_menu(screen, selected):
     screen.fill(BLACK)
-    title_surf = title_font.render("Escape The Experiment", True, WHITE)
+    title_surf = game.get_font(TITLE_FONT_SIZE).render("Escape The Experiment", True, WHITE)
     screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 100))
 
-    option = menu_options[0]
-    color = HIGHLIGHT if selected == 0 else WHITE
-    surf = menu_font.render(option, True, color)
-    screen.blit(surf, (SCREEN_WIDTH//2 - surf.get_width()//2, SCREEN_HEIGHT//2 - surf.get_height()//2))
+    menu_font = game.get_font(MENU_FONT_SIZE)
+    for i, option in enumerate(menu_options):
+        color = HIGHLIGHT if selected == i else WHITE
+        surf = menu_font.render(option, True, color)
+        y = SCREEN_HEIGHT//2 - surf.get_height()//2 + i * 60
+        screen.blit(surf, (SCREEN_WIDTH//2 - surf.get_width()//2, y))
 
     pygame.display.flip()
 
 
-def main_menu():
+def main_menu(screen, preloader=None):
     selected = 0
     clock = pygame.time.Clock()
+    first_frame = True
+    preload_reported = preloader is None
     while True:
-        draw_menu(selected)
+        draw_menu(screen, selected)
+        if first_frame:
+            first_frame = False
+            print(f"First interactive frame {(time.perf_counter() - START_TIME) * 1000:.0f} ms "
+                  f"after main_menu.py started")
+        if not preload_reported and preloader.elapsed is not None:
+            preload_reported = True
+            print(f"Levels and tiles preloaded in the background in {preloader.elapsed * 1000:.0f} ms")
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
+                game.shutdown()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
-                    return
+                    return menu_options[selected]
+                elif event.key == pygame.K_UP:
+                    selected = (selected - 1) % len(menu_options)
+                elif event.key == pygame.K_DOWN:
+                    selected = (selected + 1) % len(menu_options)
+        # Use idle frame time to finish loading game assets
+        if preloader:
+            preloader.step()
         clock.tick(FPS)
 
 
@@ -63,13 +85,18 @@ def get_level_files(path):
 
 
 if __name__ == '__main__':
-    # Show only Play menu
-    main_menu()
+    screen = game.init_display()
+    pygame.display.set_caption("Baba Quantum")
 
-    # Launch default levels
+    # Start loading levels and assets while the menu is on screen
     level_files = get_level_files(game.LEVEL_PATH)
+    preloader = game.Preloader(level_files) if level_files else None
+
+    choice = main_menu(screen, preloader)
+
+    # Launch default levels
     if level_files:
-        game.run_levels(level_files)
+        game.run_levels(level_files, save_path=SAVE_PATH, resume=(choice == 'Continue'), preloader=preloader)
 
-    pygame.quit()
+    game.shutdown()
     sys.exit()
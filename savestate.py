@@ -0,0 +1,304 @@
+"""Compact binary snapshots of a running game.
+
+A snapshot holds everything needed to resume exactly where the player left
+off: the level index, every entity with its position and flags, collapse
+state of superposition walls, entanglement pairs, the quantum goal and the
+state of the shared random generator.
+
+Layout (little endian):
+
+    header      4s magic, B version, H level index, B width, B height,
+                H entity count, H wall count, H pair count
+    entities    4 bytes each: type code, x, y, flags
+    walls       per SuperpositionWall in entity order: d collapse
+                probability, f shimmer offset
+    pairs       H, H entity indices of each entanglement pair
+    quantum     B position count (0 = no quantum goal), B chosen index
+                (255 = not collapsed), then per position B x, B y, d weight
+    rng         B version, 625 I words, B has gauss, d gauss
+"""
+import math
+import os
+import random
+import struct
+import threading
+
+import game
+
+MAGIC = b'QSAV'
+VERSION = 1
+
+# Type codes are the index into this tuple; append only.
+ENTITY_TYPES = (
+    game.UnmovableTile,
+    game.PlayerBlockedTile,
+    game.Goal,
+    game.Player,
+    game.MovableBlock,
+    game.SchrodingerBox,
+    game.SuperpositionWall,
+)
+TYPE_CODES = {cls: code for code, cls in enumerate(ENTITY_TYPES)}
+
+FLAG_ENTANGLABLE = 1
+FLAG_SELECTED = 2
+FLAG_SUPERPOSITION = 4
+FLAG_SOLID = 8
+
+HEADER = struct.Struct('<4sBHBBHHH')
+ENTITY = struct.Struct('<BBBB')
+WALL = struct.Struct('<df')
+PAIR = struct.Struct('<HH')
+QUANTUM = struct.Struct('<BB')
+QUANTUM_POSITION = struct.Struct('<BBd')
+RNG_WORDS = 625
+RNG = struct.Struct(f'<B{RNG_WORDS}IBd')
+
+NOT_COLLAPSED = 255
+
+
+class SaveStateError(Exception):
+    """Raised when a snapshot cannot be decoded"""
+
+
+def encode(level_index, grid, quantum_goal):
+    """Serialize the current game state to bytes"""
+    entities = []
+    for column in grid.cells:
+        for cell in column:
+            entities.extend(cell)
+    index = {id(e): i for i, e in enumerate(entities)}
+
+    records = []
+    walls = []
+    pairs = []
+    for i, entity in enumerate(entities):
+        flags = 0
+        if isinstance(entity, game.MovableBlock):
+            if entity.entanglable:
+                flags |= FLAG_ENTANGLABLE
+            if entity.selected:
+                flags |= FLAG_SELECTED
+            # A partner missing from the grid is stale (e.g. left over from a
+            # reset level) and cannot be restored, so it is not saved.
+            partner = index.get(id(entity.entangled_with))
+            if partner is not None and partner > i:
+                pairs.append(PAIR.pack(i, partner))
+        elif isinstance(entity, game.SuperpositionWall):
+            if entity.is_superposition:
+                flags |= FLAG_SUPERPOSITION
+            if entity._is_solid:
+                flags |= FLAG_SOLID
+            walls.append(WALL.pack(entity.collapse_probability, entity.shimmer_offset))
+        records.append(ENTITY.pack(TYPE_CODES[type(entity)], entity.x, entity.y, flags))
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, level_index, grid.width, grid.height,
+                    len(records), len(walls), len(pairs)),
+        b''.join(records),
+        b''.join(walls),
+        b''.join(pairs),
+    ]
+
+    if quantum_goal is None:
+        parts.append(QUANTUM.pack(0, NOT_COLLAPSED))
+    else:
+        chosen = NOT_COLLAPSED
+        if quantum_goal.collapsed:
+            chosen = quantum_goal.positions.index(tuple(quantum_goal.chosen_position))
+        parts.append(QUANTUM.pack(len(quantum_goal.positions), chosen))
+        for (x, y), p in zip(quantum_goal.positions, quantum_goal.probabilities):
+            parts.append(QUANTUM_POSITION.pack(x, y, p))
+
+    version, words, gauss = random.getstate()
+    parts.append(RNG.pack(version, *words, gauss is not None, gauss or 0.0))
+    return b''.join(parts)
+
+
+def decode(data):
+    """Rebuild (level_index, grid, player, quantum_goal) from a snapshot
+
+    Also restores the shared random generator and the module-level
+    entanglement selection in game.
+    """
+    try:
+        return _decode(memoryview(data))
+    except (struct.error, IndexError, ValueError) as exc:
+        raise SaveStateError(f'corrupt snapshot: {exc}') from exc
+
+
+def _decode(data):
+    magic, version, level_index, width, height, n_entities, n_walls, n_pairs = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveStateError('not a save file')
+    if version != VERSION:
+        raise SaveStateError(f'unsupported save version {version}')
+    # The game loop iterates the fixed grid size, so nothing else can be resumed.
+    if (width, height) != (game.GRID_WIDTH, game.GRID_HEIGHT):
+        raise SaveStateError(f'grid size {width}x{height} does not match the game')
+    offset = HEADER.size
+
+    grid = game.Grid(width, height)
+    entities = []
+    player = None
+    selected = None
+
+    end = offset + n_entities * ENTITY.size
+    wall_data = list(WALL.iter_unpack(data[end:end + n_walls * WALL.size]))
+    if len(wall_data) != n_walls:
+        raise SaveStateError('truncated wall data')
+    walls_used = 0
+    for code, x, y, flags in ENTITY.iter_unpack(data[offset:end]):
+        cls = ENTITY_TYPES[code]
+        if cls is game.SuperpositionWall:
+            if walls_used == n_walls:
+                raise SaveStateError('more superposition walls than wall records')
+            probability, shimmer = wall_data[walls_used]
+            walls_used += 1
+            entity = cls(x, y, probability)
+            entity.shimmer_offset = shimmer
+            entity.is_superposition = bool(flags & FLAG_SUPERPOSITION)
+            entity._is_solid = bool(flags & FLAG_SOLID)
+            if not entity.is_superposition and entity._is_solid:
+                entity.color = game.UNMOVABLE_COLOR
+        elif cls is game.MovableBlock:
+            entity = cls(x, y, entanglable=bool(flags & FLAG_ENTANGLABLE))
+        else:
+            entity = cls(x, y)
+        if flags & FLAG_SELECTED:
+            if not isinstance(entity, game.MovableBlock):
+                raise SaveStateError(f'{cls.__name__} cannot be selected')
+            entity.selected = True
+            selected = entity
+        if cls is game.Player:
+            if player is not None:
+                raise SaveStateError('more than one player')
+            player = entity
+        grid.add_entity(entity)
+        entities.append(entity)
+    if walls_used != n_walls:
+        raise SaveStateError('fewer superposition walls than wall records')
+    if player is None:
+        raise SaveStateError('no player')
+    offset = end + n_walls * WALL.size
+
+    end = offset + n_pairs * PAIR.size
+    for a, b in PAIR.iter_unpack(data[offset:end]):
+        if (a == b or not isinstance(entities[a], game.MovableBlock)
+                or not isinstance(entities[b], game.MovableBlock)):
+            raise SaveStateError(f'invalid entanglement pair ({a}, {b})')
+        entities[a].entangled_with = entities[b]
+        entities[b].entangled_with = entities[a]
+    offset = end
+
+    n_positions, chosen = QUANTUM.unpack_from(data, offset)
+    offset += QUANTUM.size
+    quantum_goal = None
+    if n_positions:
+        positions = []
+        probabilities = []
+        for _ in range(n_positions):
+            x, y, p = QUANTUM_POSITION.unpack_from(data, offset)
+            offset += QUANTUM_POSITION.size
+            if not grid.in_bounds(x, y):
+                raise SaveStateError(f'quantum goal position ({x}, {y}) out of bounds')
+            if not (math.isfinite(p) and p >= 0):
+                raise SaveStateError(f'invalid quantum goal weight {p}')
+            positions.append((x, y))
+            probabilities.append(p)
+        if not sum(probabilities) > 0:
+            raise SaveStateError('quantum goal weights sum to zero')
+        quantum_goal = game.QuantumParticle(positions, probabilities)
+        if chosen != NOT_COLLAPSED:
+            # The measured Goal entity was saved with the grid.
+            quantum_goal.collapsed = True
+            quantum_goal.chosen_position = positions[chosen]
+
+    rng = RNG.unpack_from(data, offset)
+    offset += RNG.size
+    if offset != len(data):
+        raise SaveStateError('trailing data in snapshot')
+
+    # Restore the generator last: SuperpositionWall() above draws from it.
+    gauss = rng[-1] if rng[-2] else None
+    random.setstate((rng[0], tuple(rng[1:1 + RNG_WORDS]), gauss))
+    game.selected_box = selected
+    return level_index, grid, player, quantum_goal
+
+
+def save(path, data):
+    """Write a snapshot atomically"""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load(path):
+    """Read and decode a snapshot, or return None if there is none"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return decode(data)
+
+
+class Autosaver:
+    """Writes snapshots on a background thread
+
+    Encoding is cheap and must see a consistent grid, so it happens on the
+    caller's thread; only the file write is deferred. If several snapshots
+    are queued before the writer catches up, only the newest is written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = None
+        self._closed = False
+        # Bumped by discard(); a snapshot taken in an older generation is stale.
+        self._generation = 0
+        self._condition = threading.Condition()
+        # Held only by file operations, so submit() never waits on disk I/O.
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        with self._condition:
+            self._pending = data
+            self._condition.notify()
+
+    def discard(self):
+        """Drop any queued snapshot and delete the save file"""
+        with self._condition:
+            self._pending = None
+            self._generation += 1
+        with self._write_lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Write any queued snapshot and stop the writer"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                data, self._pending = self._pending, None
+                generation = self._generation
+            with self._write_lock:
+                # discard() may have run between taking the snapshot and here.
+                with self._condition:
+                    if generation != self._generation:
+                        continue
+                save(self.path, data)
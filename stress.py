@@ -0,0 +1,299 @@
+"""Headless randomized stress harness for the game rules.
+
+Drives Player.move, handle_entangle_click and QuantumParticle.measure with
+random inputs across every level, checking grid invariants after each step.
+No display is opened. Failing episodes are shrunk to a short reproducer.
+
+    python stress.py --steps 2000000 --workers 4
+    python stress.py --replay repro.json
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import game
+
+LEVEL_PATH = 'levels'
+
+MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Full-grid scans are comparatively expensive; cheap per-entity checks run
+# after every step and a full scan runs this often and at episode end.
+FULL_CHECK_EVERY = 64
+
+
+class InvariantError(Exception):
+    """Raised when the grid reaches an impossible state"""
+
+
+def is_solid(entity):
+    """Whether an entity occupies its cell exclusively"""
+    if isinstance(entity, (game.Goal, game.PlayerBlockedTile)):
+        return False
+    if isinstance(entity, game.SuperpositionWall):
+        return entity.can_block()
+    return True
+
+
+def build_level(layout):
+    """Create a fresh grid, player and quantum goal for a layout"""
+    game.selected_box = None
+    grid = game.Grid(game.GRID_WIDTH, game.GRID_HEIGHT)
+    game.load_level(grid, layout)
+    player = game.find_player(grid)
+    quantum_goal = game.setup_quantum_goal(grid)
+    return grid, player, quantum_goal
+
+
+def collect_mobile(grid):
+    """All entities that can change cells during play"""
+    mobile = []
+    for column in grid.cells:
+        for cell in column:
+            for entity in cell:
+                if isinstance(entity, (game.Player, game.MovableBlock)):
+                    mobile.append(entity)
+    return mobile
+
+
+def census(grid):
+    """Count of each entity type over the whole grid"""
+    counts = {}
+    for column in grid.cells:
+        for cell in column:
+            for entity in cell:
+                name = type(entity).__name__
+                counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def check_local(grid, mobile):
+    """Per-step check on the cells currently holding a mobile entity"""
+    cells = grid.cells
+    for entity in mobile:
+        if not grid.in_bounds(entity.x, entity.y):
+            raise InvariantError(f'{type(entity).__name__} left the grid at ({entity.x}, {entity.y})')
+        cell = cells[entity.x][entity.y]
+        if entity not in cell:
+            raise InvariantError(f'{type(entity).__name__} not stored at its position ({entity.x}, {entity.y})')
+        solid = 0
+        for other in cell:
+            if is_solid(other):
+                solid += 1
+        if solid > 1:
+            names = ', '.join(type(e).__name__ for e in cell)
+            raise InvariantError(f'{solid} solid objects at ({entity.x}, {entity.y}): {names}')
+
+
+def check_full(grid, mobile, initial):
+    """Whole-grid check: cell consistency, single player, conserved boxes"""
+    for x, column in enumerate(grid.cells):
+        for y, cell in enumerate(column):
+            solid = 0
+            for entity in cell:
+                if (entity.x, entity.y) != (x, y):
+                    raise InvariantError(f'{type(entity).__name__} at ({entity.x}, {entity.y}) stored in cell ({x}, {y})')
+                if is_solid(entity):
+                    solid += 1
+            if solid > 1:
+                names = ', '.join(type(e).__name__ for e in cell)
+                raise InvariantError(f'{solid} solid objects at ({x}, {y}): {names}')
+
+    counts = census(grid)
+    if counts.get('Player', 0) != 1:
+        raise InvariantError(f"expected a single player, found {counts.get('Player', 0)}")
+    for name in ('SchrodingerBox', 'MovableBlock'):
+        if counts.get(name, 0) != initial.get(name, 0):
+            raise InvariantError(f'{name} count changed from {initial.get(name, 0)} to {counts.get(name, 0)}')
+    check_local(grid, mobile)
+
+
+def random_action(rng, grid, mobile, quantum_goal):
+    """Pick a random input, biased towards interesting clicks"""
+    roll = rng.random()
+    if roll < 0.75:
+        dx, dy = MOVES[rng.randrange(4)]
+        return ('move', dx, dy)
+    if roll < 0.97:
+        targets = [e for e in mobile if isinstance(e, game.MovableBlock) and e.entanglable]
+        if targets and rng.random() < 0.9:
+            target = targets[rng.randrange(len(targets))]
+            return ('click', target.x, target.y)
+        return ('click', rng.randrange(grid.width), rng.randrange(grid.height))
+    if quantum_goal is not None:
+        return ('measure',)
+    dx, dy = MOVES[rng.randrange(4)]
+    return ('move', dx, dy)
+
+
+def apply_action(action, grid, player, quantum_goal):
+    kind = action[0]
+    if kind == 'move':
+        player.move(action[1], action[2], grid)
+    elif kind == 'click':
+        if grid.in_bounds(action[1], action[2]):
+            game.handle_entangle_click(grid, action[1], action[2])
+    elif kind == 'measure':
+        if quantum_goal is not None:
+            quantum_goal.measure(grid)
+
+
+def replay(layout, seed, actions):
+    """Run a fixed action list; return the failure message or None"""
+    random.seed(seed)
+    grid, player, quantum_goal = build_level(layout)
+    mobile = collect_mobile(grid)
+    initial = census(grid)
+    try:
+        for action in actions:
+            apply_action(action, grid, player, quantum_goal)
+            check_local(grid, mobile)
+        check_full(grid, mobile, initial)
+    except InvariantError as exc:
+        return str(exc)
+    return None
+
+
+def minimize(layout, seed, actions):
+    """Shrink a failing action list by greedy chunk removal (ddmin style)"""
+    # Anything after the first failing step is irrelevant.
+    for end in range(1, len(actions) + 1):
+        if replay(layout, seed, actions[:end]):
+            actions = actions[:end]
+            break
+
+    chunk = len(actions) // 2
+    while chunk >= 1:
+        i = 0
+        while i < len(actions):
+            candidate = actions[:i] + actions[i + chunk:]
+            if candidate and replay(layout, seed, candidate):
+                actions = candidate
+            else:
+                i += chunk
+        chunk //= 2
+    return actions
+
+
+def run_episode(layout, seed, length):
+    """Play one random episode; return (steps, failure or None)"""
+    # The game draws from the module-level random generator for wall
+    # probabilities and collapses, so seed it for reproducible episodes.
+    random.seed(seed)
+    rng = random.Random(seed ^ 0x5EED)
+    grid, player, quantum_goal = build_level(layout)
+    mobile = collect_mobile(grid)
+    initial = census(grid)
+    actions = []
+
+    try:
+        for step in range(1, length + 1):
+            action = random_action(rng, grid, mobile, quantum_goal)
+            actions.append(action)
+            apply_action(action, grid, player, quantum_goal)
+            check_local(grid, mobile)
+            if step % FULL_CHECK_EVERY == 0:
+                check_full(grid, mobile, initial)
+        check_full(grid, mobile, initial)
+    except InvariantError:
+        return len(actions), actions
+    return length, None
+
+
+def worker(args):
+    """Run episodes until the step budget is spent or a failure is found"""
+    level_files, seed, steps, episode_length = args
+    layouts = [load_layout(f) for f in level_files]
+    rng = random.Random(seed)
+    done = 0
+    while done < steps:
+        index = rng.randrange(len(layouts))
+        episode_seed = rng.getrandbits(32)
+        ran, actions = run_episode(layouts[index], episode_seed, min(episode_length, steps - done))
+        done += ran
+        if actions is not None:
+            return done, {
+                'level': level_files[index],
+                'seed': episode_seed,
+                'actions': actions,
+            }
+    return done, None
+
+
+def load_layout(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f).get('layout', [])
+
+
+def report(failure):
+    layout = load_layout(failure['level'])
+    actions = minimize(layout, failure['seed'], failure['actions'])
+    repro = {
+        'level': failure['level'],
+        'seed': failure['seed'],
+        'actions': [list(a) for a in actions],
+        'error': replay(layout, failure['seed'], actions),
+    }
+    print(f"FAIL {repro['level']}: {repro['error']}")
+    print(f"  minimized from {len(failure['actions'])} to {len(actions)} actions")
+    print(json.dumps(repro))
+    return repro
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=1_000_000, help='total steps across all workers')
+    parser.add_argument('--episode-length', type=int, default=200, help='steps before a level is reset')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--levels', default=LEVEL_PATH, help='directory of level JSON files')
+    parser.add_argument('--out', default=None, help='write the minimized reproducer to this file')
+    parser.add_argument('--replay', default=None, help='re-run a reproducer file and exit')
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay, 'r', encoding='utf-8') as f:
+            repro = json.load(f)
+        error = replay(load_layout(repro['level']), repro['seed'], [tuple(a) for a in repro['actions']])
+        print(f'FAIL: {error}' if error else 'OK')
+        return 1 if error else 0
+
+    level_files = sorted(glob.glob(os.path.join(args.levels, '*.json')))
+    if not level_files:
+        parser.error(f'no levels found in {args.levels}')
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    workers = max(1, args.workers)
+    share = -(-args.steps // workers)
+    jobs = [(level_files, seed + i, share, args.episode_length) for i in range(workers)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [worker(jobs[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+
+    total = sum(done for done, _ in results)
+    print(f'{total} steps in {elapsed:.1f}s ({total / elapsed:,.0f} steps/s), seed {seed}')
+
+    failures = [failure for _, failure in results if failure is not None]
+    if not failures:
+        print('OK')
+        return 0
+
+    repro = report(failures[0])
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(repro, f)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())